@@ -65,6 +65,23 @@ def _parse_args() -> argparse.Namespace:
         ),
     )
 
+    ap.add_argument(
+        "--retail-cache-dir",
+        help=(
+            "Directory for cached live Retail API responses. "
+            "If omitted, falls back to BOM['retail_cache_dir'] or ~/.cache/azure-bom/retail."
+        ),
+    )
+    ap.add_argument(
+        "--retail-cache-ttl-hours",
+        type=float,
+        help=(
+            "Reuse cached live Retail API responses younger than this many hours "
+            "(default: 24; 0 disables the cache). "
+            "If omitted, falls back to BOM['retail_cache_ttl_hours']."
+        ),
+    )
+
     # Enterprise (MCA / EA) options
     ap.add_argument(
         "--enterprise-csv",
@@ -185,6 +202,8 @@ def main() -> None:
         retail_offline=args.retail_offline,
         retail_filter=args.retail_filter,
         retail_temp_dir=args.retail_temp_dir,
+        retail_cache_dir=args.retail_cache_dir,
+        retail_cache_ttl_hours=args.retail_cache_ttl_hours,
         enterprise_price_sheet_api=args.enterprise_price_sheet_api,
         billing_account=args.billing_account,
         enrollment_account=args.enrollment_account,
@@ -1,11 +1,9 @@
 from __future__ import annotations
 
-from typing import Dict, Optional, Any, Iterable, List, Set
-from decimal import Decimal
+from functools import lru_cache
+from typing import AbstractSet, Dict, Optional, Any, Iterable, List, Set, Tuple
 import json
-
-# If these live next to this file, import directly; otherwise adjust path.
-from .math import decimal  # used for price parsing
+import sys
 
 # -------------------------------------------------------------------
 # Canonical CSV schema for Azure pricing rows
@@ -21,14 +19,23 @@ ALLOWED_HEADINGS = (
 # Default row skeleton: ensure every cleaned row always has these keys
 _DEFAULTS: Dict[str, Optional[str]] = {k: None for k in ALLOWED_HEADINGS}
 
+# Low-cardinality columns repeated across thousands of rows; interned so rows
+# share one string object per value and equality checks hit the identity fast path.
+_INTERNED_HEADINGS = frozenset({
+    "serviceName", "productName", "unitOfMeasure", "currencyCode", "armRegionName",
+    "priceType", "type", "location", "serviceFamily", "reservationTerm", "isPrimaryMeterRegion",
+})
+
 
 # -------------------------------------------------------------------
 # Region helpers
 # -------------------------------------------------------------------
+@lru_cache(maxsize=None)
 def arm_region(region_str: str) -> str:
     """
     Map human region label ('Australia East') -> ARM format ('australiaeast').
-    Empty-safe.
+    Empty-safe. Cached without a bound: it runs for every cleaned row, and the
+    key space (Azure region labels in their few spellings) is small and fixed.
     """
     return (region_str or "").strip().lower().replace(" ", "")
 
@@ -52,19 +59,26 @@ def dedup_merge(lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
     De-dup key preference:
       1) meterId if present (globally unique)
       2) otherwise, a tuple of (serviceName, skuName, meterName, unitOfMeasure, armRegionName)
+
+    Keys are always tuples, so the seen-set holds one key type.
     """
-    seen: set = set()
+    seen: Set[Tuple[Any, ...]] = set()
     out: List[Dict[str, Any]] = []
 
     for lst in lists:
         for r in lst or []:
-            key = r.get("meterId") or (
-                r.get("serviceName"),
-                r.get("skuName"),
-                r.get("meterName"),
-                r.get("unitOfMeasure"),
-                r.get("armRegionName"),
-            )
+            key: Tuple[Any, ...]
+            meter_id = r.get("meterId")
+            if meter_id:
+                key = (meter_id,)
+            else:
+                key = (
+                    r.get("serviceName"),
+                    r.get("skuName"),
+                    r.get("meterName"),
+                    r.get("unitOfMeasure"),
+                    r.get("armRegionName"),
+                )
             if key in seen:
                 continue
             seen.add(key)
@@ -92,14 +106,15 @@ def pick(items: List[dict], prefer_uom: Optional[str] = None) -> Optional[dict]:
     """
     if not items:
         return None
-    if prefer_uom:
-        for i in items:
-            if (i.get("unitOfMeasure") == prefer_uom) and decimal(i.get("retailPrice") or 0) > 0:
-                return i
+    first_positive: Optional[dict] = None
     for i in items:
-        if decimal(i.get("retailPrice") or 0) > 0:
+        if not _is_positive(i):
+            continue
+        if not prefer_uom or i.get("unitOfMeasure") == prefer_uom:
             return i
-    return items[0]
+        if first_positive is None:
+            first_positive = i
+    return first_positive or items[0]
 
 
 def _to_scalar(v: Any) -> Optional[str]:
@@ -183,7 +198,8 @@ def _clean_row_to_allowed(r: Dict[str, Any]) -> Dict[str, Any]:
 
     # ---- Ensure CSV-safe scalars ----
     for k in ALLOWED_HEADINGS:
-        out[k] = _to_scalar(out[k])
+        v = _to_scalar(out[k])
+        out[k] = sys.intern(v) if v is not None and k in _INTERNED_HEADINGS else v
 
     # Return only canonical keys
     return {k: out[k] for k in ALLOWED_HEADINGS}
@@ -212,6 +228,25 @@ def prefer_region(rows: List[CsvRow], region: str) -> List[CsvRow]:
     return sorted(rows, key=keyfn)
 
 
+def pick_preferred_region(rows: List[CsvRow], region: str) -> Optional[CsvRow]:
+    """
+    Same result as pick_first_row(prefer_region(rows, region)) without sorting:
+    return the first row in the given region as soon as it is seen, else the first
+    global/empty-region row, else the first row.
+    """
+    arm_l = arm_region(region).lower()
+    first_global: Optional[CsvRow] = None
+    for r in rows:
+        row_arm = (str(r.get("armRegionName") or "")).lower()
+        if row_arm == arm_l:
+            return r
+        if row_arm == "" and first_global is None:
+            first_global = r
+    if first_global is not None:
+        return first_global
+    return rows[0] if rows else None
+
+
 def pick_first_row(rows: List[CsvRow]) -> Optional[CsvRow]:
     """Pick the first row or None."""
     return rows[0] if rows else None
@@ -230,12 +265,19 @@ def _text(i: CsvRow) -> str:
     ]).lower()
 
 
-def _price(i: CsvRow) -> Decimal:
-    return decimal(i.get("retailPrice") or 0)
+def _price_float(i: CsvRow) -> float:
+    """
+    retailPrice as a float, for comparisons only (never for billed amounts).
+    Much cheaper than building a Decimal per row while filtering.
+    """
+    try:
+        return float(str(i.get("retailPrice") or 0))
+    except (TypeError, ValueError):
+        return 0.0
 
 
 def _is_positive(i: CsvRow) -> bool:
-    return _price(i) > 0
+    return _price_float(i) > 0
 
 
 def _eq(i: CsvRow, key: str, val: str) -> bool:
@@ -247,7 +289,7 @@ def filter_rows(
         required_equals: Dict[str, str],
         required_uom: Optional[str] = None,
         must_contain: Optional[List[str]] = None,
-        allowed_price_types: Optional[Set[str]] = None,  # e.g. {"Consumption","DevTestConsumption"}
+        allowed_price_types: Optional[AbstractSet[str]] = None,  # e.g. {"Consumption"}
         region_hint: Optional[str] = None,               # human-readable region, e.g. "Australia East"
 ) -> List[CsvRow]:
     """
@@ -262,6 +304,7 @@ def filter_rows(
     tokens = [t.lower() for t in (must_contain or []) if t]
     uom_l = (required_uom or "").lower()
     arm_region_l = arm_region(region_hint).lower() if region_hint else None
+    allowed = {t.lower() for t in allowed_price_types} if allowed_price_types else None
 
     out: List[CsvRow] = []
     for i in items:
@@ -274,10 +317,9 @@ def filter_rows(
             continue
 
         # allowed price types: accept either priceType or type
-        if allowed_price_types:
+        if allowed:
             pt = (str(i.get("priceType") or "")).lower()
             typ = (str(i.get("type") or "")).lower()
-            allowed = {t.lower() for t in allowed_price_types}
             if (pt not in allowed) and (typ not in allowed):
                 continue
 
@@ -292,9 +334,11 @@ def filter_rows(
             if row_arm and row_arm != arm_region_l:
                 continue
 
-        # Must contain tokens across canonical text
-        if tokens and any(tok not in _text(i) for tok in tokens):
-            continue
+        # Must contain tokens across canonical text (built once per row, not per token)
+        if tokens:
+            text = _text(i)
+            if any(tok not in text for tok in tokens):
+                continue
 
         out.append(i)
 
@@ -0,0 +1,27 @@
+import json
+from typing import Any, Union
+
+try:  # optional: pip install 'azure-bom-costing[fast]'
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None  # type: ignore[assignment]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON, using orjson when installed (3-5x faster on large Retail pages).
+
+    orjson only accepts BOM-less UTF-8; on a decode error the stdlib parser gets
+    a second try, since it detects a UTF-8 BOM and UTF-16/32 in bytes input.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def load_file(path: str) -> Any:
+    """Read and decode a JSON file from disk."""
+    with open(path, "rb") as f:
+        return loads(f.read())
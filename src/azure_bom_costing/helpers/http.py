@@ -1,6 +1,19 @@
 from typing import Optional, Dict
+import threading
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from . import fastjson
+
+# Connection pool sizing for the shared session (one pool per host). Max size
+# leaves headroom over the retail and component worker pools, so concurrent
+# callers never have a connection thrown away after use.
+_POOL_CONNECTIONS = 20
+_POOL_MAXSIZE = 32
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
 
 # ---------- HTTP helpers ----------
 def http_get_json(url: str, headers: Optional[Dict[str, str]] = None) -> dict:
@@ -9,9 +22,9 @@ def http_get_json(url: str, headers: Optional[Dict[str, str]] = None) -> dict:
     Raises:
         requests.HTTPError on non-2xx responses.
     """
-    r = requests.get(url, headers=headers or {}, timeout=60)
+    r = get_session().get(url, headers=headers or {}, timeout=60)
     r.raise_for_status()
-    return r.json()
+    return fastjson.loads(r.content)
 
 
 def http_get(url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
@@ -23,9 +36,25 @@ def http_get(url: str, headers: Optional[Dict[str, str]] = None) -> requests.Res
     Raises:
         requests.HTTPError on non-2xx responses.
     """
-    r = requests.get(url, headers=headers or {}, timeout=300, stream=True)
+    r = get_session().get(url, headers=headers or {}, timeout=300, stream=True)
     r.raise_for_status()
     return r
 
 def get_session() -> requests.Session:
-    return requests.Session()
\ No newline at end of file
+    """Return the process-wide HTTP session (created on first use).
+
+    Reusing one session keeps TCP/TLS connections alive between calls
+    (requests already advertises gzip, so large JSON pages are compressed).
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            # No transport-level retries: the Retail API pagers in pricing.retail
+            # run their own retry loops. http_get/http_get_json stay single-attempt,
+            # as they were before the shared session.
+            adapter = HTTPAdapter(pool_connections=_POOL_CONNECTIONS, pool_maxsize=_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+    return _SESSION
\ No newline at end of file
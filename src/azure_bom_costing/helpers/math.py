@@ -1,11 +1,13 @@
 from decimal import Decimal, ROUND_HALF_UP
 
+_CENT = Decimal("0.01")
+
 def money(v) -> Decimal:
     """Quantise a numeric value to 2 decimal places using ROUND_HALF_UP.
 
     Appropriate for currency values (e.g., AUD).
     """
-    return Decimal(v).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return Decimal(v).quantize(_CENT, rounding=ROUND_HALF_UP)
 
 
 def decimal(val, default=Decimal(0)) -> Decimal:
@@ -1,20 +1,197 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from typing import Dict, List, Optional, Set, Tuple
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Set, Tuple
 
-from .csv import dedup_merge, arm_region, filter_rows, prefer_region, pick_first
+from .csv import dedup_merge, arm_region, filter_rows, pick_preferred_region
 from .math import decimal
+from .string import stripped
 from ..pricing.enterprise import enterprise_lookup
-from ..pricing.retail import search_saved_retail_items, retail_fetch_items_live
+from ..pricing.retail import (
+    on_clear_retail_cache,
+    retail_fetch_items_live,
+    search_saved_retail_items,
+)
 from ..types import Key
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for live Retail API calls: the filters are independent and I/O-bound.
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="retail")
+
+_ZERO = Decimal(0)
+
+# Allow on-demand, dev/test, and reservations by default
+_DEFAULT_PRICE_TYPES: FrozenSet[str] = frozenset(
+    {"Consumption", "DevTestConsumption", "Reservation"}
+)
+
+# Retail $filter templates, regioned first then global.
+_FILTER_TEMPLATES: Tuple[str, ...] = (
+    "{field} eq '{value}' and armRegionName eq '{arm}'",
+    "{field} eq '{value}'",
+)
+
+
+def _product_suffix(product: Optional[str]) -> str:
+    return f" / {product}" if product else ""
+
+
+def _describe(
+        service: str,
+        product: Optional[str],
+        sku: Optional[str],
+        unit: Optional[Decimal],
+        uom: Optional[str],
+        qty: Decimal,
+        hours: Decimal,
+) -> str:
+    """
+    Single place that renders the component line shown in the report.
+    A unit of None (rate not looked up) renders as 'n/a'.
+    """
+    rate = "n/a" if unit is None else unit
+    return f"{service}{_product_suffix(product)} {sku} @{rate}/{uom or 'unit'} × {qty} × {hours}"
+
+
+@lru_cache(maxsize=1024)
+def _retail_unit_price(
+        service: str,
+        product: Optional[str],
+        region: str,
+        currency: str,
+        uom: Optional[str],
+        tokens: Tuple[str, ...],
+        extra_required_equals: Tuple[Tuple[str, str], ...],
+        allowed_price_types: Optional[FrozenSet[str]],
+) -> Tuple[Decimal, int]:
+    """
+    Resolve the retail unit price for one lookup signature.
+
+    Returns (unit, matching_row_count). Memoised: components that share the same
+    service/product/region/currency/uom/filters resolve once, so a BOM with many
+    identical rows fetches and filters the retail catalogue only once. The memo is
+    dropped by clear_retail_cache(), together with the caches it sits on.
+    """
+    # -------------------------------------------------------------------------
+    # 2) Retail fallback (saved JSON pages → live API), then
+    # 3) filter candidate rows (priceType/type, UOM, tokens, region)
+    # -------------------------------------------------------------------------
+    arm = arm_region(region)
+    logger.debug("No enterprise match; using retail fallback via ARM region '%s'", arm)
+
+    # Build filters: regioned first, then the broader global ones.
+    fields = [("serviceName", service)] + ([("productName", product)] if product else [])
+    regioned_filters = [_FILTER_TEMPLATES[0].format(field=f, value=v, arm=arm) for f, v in fields]
+    global_filters = [_FILTER_TEMPLATES[1].format(field=f, value=v, arm=arm) for f, v in fields]
+
+    if allowed_price_types is None:
+        allowed_price_types = _DEFAULT_PRICE_TYPES
+
+    def _filter(items: List[dict], required_eq: Dict[str, str]) -> List[dict]:
+        return filter_rows(
+            items,
+            required_equals=required_eq,
+            required_uom=uom,
+            must_contain=list(tokens),
+            allowed_price_types=allowed_price_types,
+            region_hint=region,
+        )
+
+    service_equals = {"serviceName": service}
+    service_equals.update(extra_required_equals)
+
+    def _select(items: List[dict]) -> List[dict]:
+        # First pass: serviceName (+ any extra required columns)
+        rows = _filter(items, service_equals)
+        # Fallback: productName (ONLY if product provided)
+        if not rows and product:
+            rows = _filter(items, {"productName": product})
+        return rows
+
+    def _fetch_live(filters: List[str]) -> List[dict]:
+        # One failed filter shouldn't sink the others; only give up if all fail.
+        futures = [(f, _POOL.submit(retail_fetch_items_live, f, currency)) for f in filters]
+        lists: List[List[dict]] = []
+        error: Optional[BaseException] = None
+        for fexpr, fut in futures:
+            try:
+                rows = fut.result()
+            except Exception as e:
+                logger.warning("Retail API query failed for filter %r: %s", fexpr, e)
+                error = e
+                continue
+            if rows:
+                lists.append(rows)
+        if error is not None and not lists:
+            raise error
+        return dedup_merge(lists) if lists else []
+
+    # First try searching locally saved JSON pages. Each regioned filter matches
+    # a subset of its global counterpart (same page order), so only the global
+    # ones are scanned; the regioned rows come back with them.
+    lists_from_saved: List[List[dict]] = []
+    for fexpr in global_filters:
+        rows = search_saved_retail_items(
+            filter_expr=fexpr,
+            currency=currency,
+            # rely on later filters for positive price; we want full context here
+            require_positive_price=False,
+        )
+        if rows:
+            lists_from_saved.append(rows)
+
+    if lists_from_saved:
+        logger.debug(
+            "Found %d filter result sets in saved pages for service=%s, product=%s",
+            len(lists_from_saved),
+            service,
+            product,
+        )
+        items = dedup_merge(lists_from_saved)
+        rows = _select(items)
+    else:
+        # Fallback to live Retail API if nothing found in saved pages.
+        # Regioned queries first; the (much larger) global ones only when no
+        # regioned row passes the serviceName filter. A regioned serviceName row
+        # always wins the pick below, but a regioned productName row must not
+        # beat a global serviceName row, so that case still fetches globally.
+        logger.info(
+            "No matching items found in saved retail pages for %s%s; "
+            "falling back to live Retail API",
+            service,
+            _product_suffix(product),
+        )
+        items = _fetch_live(regioned_filters)
+        rows = _filter(items, service_equals)
+        if not rows:
+            items = dedup_merge([items, _fetch_live(global_filters)])
+            rows = _select(items)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Total retail items after merge for %s%s: %d",
+            service,
+            _product_suffix(product),
+            len(items),
+        )
+
+    # Prefer the requested region, then global rows (single pass, no sort)
+    row = pick_preferred_region(rows, region)
+    unit = decimal(row.get("retailPrice") or 0) if row else _ZERO
+    return unit, len(rows)
+
+
+# Resolved prices sit above the retail caches; drop them whenever those are cleared.
+on_clear_retail_cache(_retail_unit_price.cache_clear)
+
+
 def price_by_service(
         *,
         service: str,
         product: Optional[str] = None,
-        sku: str,
+        sku: Optional[str],
         region: str,
         currency: str,
         ent_prices: Dict[Key, Decimal],
@@ -49,11 +226,16 @@ def price_by_service(
     # -------------------------------------------------------------------------
     # 1) Enterprise price (if available)
     # -------------------------------------------------------------------------
-    ent = enterprise_lookup(ent_prices, service, sku, region, uom or "")
+    # SKU-less components can't match a price-sheet key, so skip the probe.
+    ent = (
+        enterprise_lookup(ent_prices, service, sku, region, uom or "")
+        if sku is not None
+        else None
+    )
     if ent is not None:
         unit = decimal(ent)
         total = unit * qty * hours
-        desc = f"{service} {sku} @{unit}/{uom or 'unit'} × {qty} × {hours}"
+        desc = _describe(service, None, sku, unit, uom, qty, hours)
         logger.info(
             "Enterprise price hit for %s %s: unit=%s, total=%s, region=%s",
             service,
@@ -64,104 +246,35 @@ def price_by_service(
         )
         return total, desc
 
-    # -------------------------------------------------------------------------
-    # 2) Retail fallback (saved JSON pages → live API)
-    # -------------------------------------------------------------------------
-    arm = arm_region(region)
-    logger.debug("No enterprise match; using retail fallback via ARM region '%s'", arm)
-
-    # Build a list of increasingly broad filters.
-    filters: List[str] = [
-        f"serviceName eq '{service}' and armRegionName eq '{arm}'",
-        f"serviceName eq '{service}'",
-    ]
-    if product:
-        filters += [
-            f"productName eq '{product}' and armRegionName eq '{arm}'",
-            f"productName eq '{product}'",
-        ]
-
-    # First try searching locally saved JSON pages
-    lists_from_saved: List[List[dict]] = []
-    for fexpr in filters:
-        rows = search_saved_retail_items(
-            filter_expr=fexpr,
-            currency=currency,
-            # rely on later filters for positive price; we want full context here
-            require_positive_price=False,
-        )
-        if rows:
-            lists_from_saved.append(rows)
-
-    if lists_from_saved:
-        logger.debug(
-            "Found %d filter result sets in saved pages for service=%s, product=%s",
-            len(lists_from_saved),
-            service,
-            product,
-        )
-        items = dedup_merge(lists_from_saved)
-    else:
-        # Fallback to live Retail API if nothing found in saved pages
+    # No usage: the total is zero whatever the rate, so skip the retail lookup
+    # (the rate is reported as unknown rather than a misleading 0).
+    if qty == 0 or hours == 0:
+        desc = _describe(service, product, sku, None, uom, qty, hours)
         logger.info(
-            "No matching items found in saved retail pages for %s%s; "
-            "falling back to live Retail API",
+            "No usage for %s %s (qty=%s, hours=%s); skipping retail lookup",
             service,
-            f' / {product}' if product else "",
+            sku,
+            qty,
+            hours,
         )
-        lists_from_live: List[List[dict]] = []
-        for fexpr in filters:
-            rows = retail_fetch_items_live(fexpr, currency)
-            if rows:
-                lists_from_live.append(rows)
-        items = dedup_merge(lists_from_live) if lists_from_live else []
-
-    logger.debug(
-        "Total retail items after merge for %s%s: %d",
-        service,
-        f' / {product}' if product else "",
-        len(items),
-    )
+        return _ZERO, desc
 
     # -------------------------------------------------------------------------
-    # 3) Filter candidate rows (priceType/type, UOM, tokens, region)
+    # 2) + 3) Retail fallback, memoised per lookup signature
     # -------------------------------------------------------------------------
-    if allowed_price_types is None:
-        # Allow on-demand, dev/test, and reservations by default
-        allowed_price_types = {"Consumption", "DevTestConsumption", "Reservation"}
-
-    tokens = [t.lower() for t in (must_contain or []) if t]
-
-    def _filter(required_eq: Dict[str, str]) -> List[dict]:
-        rows = filter_rows(
-            items,
-            required_equals=required_eq,
-            required_uom=uom,
-            must_contain=tokens,
-            allowed_price_types=allowed_price_types,
-            region_hint=region,
-        )
-        return prefer_region(rows, region)
-
-    # First pass: serviceName
-    required_equals = {"serviceName": service}
-    if extra_required_equals:
-        required_equals.update(extra_required_equals)
-
-    rows = _filter(required_equals)
-
-    # Fallback: productName (ONLY if product provided)
-    if not rows and product:
-        rows = _filter({"productName": product})
-
-    row = pick_first(rows)
-    unit = decimal(row.get("retailPrice") or 0) if row else decimal(0)
+    unit, n_rows = _retail_unit_price(
+        service,
+        product,
+        region,
+        currency,
+        uom,
+        tuple(t.lower() for t in (must_contain or []) if t),
+        tuple(sorted((extra_required_equals or {}).items())),
+        frozenset(allowed_price_types) if allowed_price_types is not None else None,
+    )
 
     total = unit * qty * hours
-    desc = (
-        f"{service}{(' / ' + product) if product else ''} "
-        f"{sku} @{unit}/{uom or 'unit'} × {qty} × {hours}"
-    )
+    desc = _describe(service, product, sku, unit, uom, qty, hours)
 
     logger.info(
         "Computed total for %s %s: unit=%s, total=%s, region=%s (rows=%d)",
@@ -170,6 +283,41 @@ def price_by_service(
         unit,
         total,
         region,
-        len(rows) if rows else 0,
+        n_rows,
+    )
+    return total, desc
+
+
+def price_component(
+        component: Mapping[str, Any],
+        region: str,
+        currency: str,
+        ent_prices: Dict[Key, Decimal],
+        *,
+        hours_default: Optional[Decimal] = None,
+) -> Tuple[Decimal, str]:
+    """
+    Generic handler body shared by every service handler: read the standard BOM
+    fields (service, product, sku, uom, quantity, hours_per_month) and price them
+    via price_by_service, using the SKU as a row-text token.
+
+    - 'service' is required (ValueError if missing); 'sku' is optional.
+    - hours_default: used when hours_per_month is missing or unparseable
+      (None keeps decimal()'s strict behaviour and raises).
+    """
+    service = stripped(component.get("service"), None)
+    if service is None:
+        raise ValueError("component has no 'service'")
+    sku = stripped(component.get("sku"), None)
+    return price_by_service(
+        service=service,
+        product=stripped(component.get("product"), None),
+        sku=sku,
+        region=region,
+        currency=currency,
+        ent_prices=ent_prices,
+        uom=stripped(component.get("uom"), None),
+        qty=decimal(component.get("quantity"), None),
+        hours=decimal(component.get("hours_per_month"), hours_default),
+        must_contain=[sku.lower()] if sku else None,
     )
-    return total, desc
\ No newline at end of file
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from typing import Any, Callable, Dict, Optional, Tuple
 
@@ -42,16 +43,55 @@ from .pricing.enterprise import (
     load_enterprise_csv,
     normalise_enterprise_rows,
 )
-from .pricing.retail import download_retail_pages
+from .pricing.retail import clear_retail_cache, configure_retail_cache, download_retail_pages
 from .types import Key
 
 log = logging.getLogger(__name__)
 
+# Components priced concurrently (each may block on the Retail API).
+_MAX_COMPONENT_WORKERS = 16
+
+# Decimal constants, built once rather than per call
+_ZERO = Decimal(0)
+_ONE = Decimal(1)
+_SP_DISCOUNT = Decimal("0.18")   # assumed SP discount
+_RI_DISCOUNT = Decimal("0.35")   # assumed RI discount
+
 
 # ---------------------------------------------------------------------------
 # Component prep helpers
 # ---------------------------------------------------------------------------
 
+# Quantity hints, checked in order when a component has no explicit 'quantity'
+_QUANTITY_HINTS: Tuple[str, ...] = (
+    "instances",
+    "vcores",
+    "gateway_units",
+    "capacity_units",
+    "operations_per_month",
+    "requests_per_month",
+    "executions",
+    "egress_gb",
+    "gb",
+    "tb",
+    "tokens_1k",
+    "images",
+    "dwu",
+    "clusters",
+    "nodes",
+    "calls_per_million",
+    "requests_millions",
+    "waf_policies",
+    "waf_rules",
+)
+
+_QUANTITY_SCALE: Dict[str, Decimal] = {
+    "requests_millions": Decimal(1_000_000),
+    "calls_per_million": Decimal(1_000_000),
+    "tb": Decimal(1024),  # Normalise TB to GB
+}
+
+
 def _derive_quantity(component: Dict[str, Any]) -> Decimal:
     """
     Derive a neutral 'quantity' if not explicitly provided.
@@ -63,43 +103,18 @@ def _derive_quantity(component: Dict[str, Any]) -> Decimal:
         return decimal(component["quantity"])
 
     # Common scale hints used across your BOMs
-    for key in (
-            "instances",
-            "vcores",
-            "gateway_units",
-            "capacity_units",
-            "operations_per_month",
-            "requests_per_month",
-            "executions",
-            "egress_gb",
-            "gb",
-            "tb",
-            "tokens_1k",
-            "images",
-            "dwu",
-            "clusters",
-            "nodes",
-            "calls_per_million",
-            "requests_millions",
-            "waf_policies",
-            "waf_rules",
-    ):
+    for key in _QUANTITY_HINTS:
         if key not in component:
             continue
 
         value = decimal(component[key])
 
-        # Scale some units up to a neutral base
-        if key in ("requests_millions", "calls_per_million"):
-            return value * decimal(1_000_000)
-        if key == "tb":
-            # Normalise TB to GB
-            return value * decimal(1024)
-
-        return value
+        # Scale some units up to a neutral base (e.g. millions, TB -> GB)
+        scale = _QUANTITY_SCALE.get(key)
+        return value * scale if scale is not None else value
 
     # Default to 1 if nothing else is provided
-    return decimal(1)
+    return _ONE
 
 
 def _apply_assumptions(component: Dict[str, Any], assumptions: Dict[str, Any]) -> None:
@@ -123,6 +138,23 @@ def _prepare_component(component: Dict[str, Any], assumptions: Dict[str, Any]) -
     return prepared
 
 
+def _price_component(
+        fn: Callable[[Dict[str, Any]], Tuple[Decimal, str]],
+        prepared: Dict[str, Any],
+        wl_name: str,
+        comp_type: str,
+) -> Tuple[Decimal, str]:
+    """
+    Run one handler, turning failures into a zero-cost line so a single bad
+    component never aborts the whole BOM.
+    """
+    try:
+        return fn(prepared)
+    except Exception as exc:
+        log.warning("Pricing error for %s/%s: %s", wl_name, comp_type, exc)
+        return _ZERO, f"Error: {exc}"
+
+
 def apply_optimisations(total: Decimal, assumptions: dict) -> Decimal:
     """
     Simple Savings Plan / Reserved Instance blending model.
@@ -130,14 +162,12 @@ def apply_optimisations(total: Decimal, assumptions: dict) -> Decimal:
     This gives a rough "with optimisations" view by splitting the total
     into RI, SP, and PAYG slices based on configured coverage percentages.
     """
-    sp_disc = decimal("0.18")   # assumed SP discount
-    ri_disc = decimal("0.35")   # assumed RI discount
     sp_cov = decimal(assumptions.get("savings_plan", {}).get("coverage_pct", 0))
     ri_cov = decimal(assumptions.get("ri", {}).get("coverage_pct", 0))
 
-    ri_slice   = total * ri_cov * (Decimal(1) - ri_disc)
-    sp_slice   = total * (Decimal(1) - ri_cov) * sp_cov * (Decimal(1) - sp_disc)
-    payg_slice = total * (Decimal(1) - ri_cov) * (Decimal(1) - sp_cov)
+    ri_slice   = total * ri_cov * (_ONE - _RI_DISCOUNT)
+    sp_slice   = total * (_ONE - ri_cov) * sp_cov * (_ONE - _SP_DISCOUNT)
+    payg_slice = total * (_ONE - ri_cov) * (_ONE - sp_cov)
 
     return ri_slice + sp_slice + payg_slice
 
@@ -258,6 +288,8 @@ def run_model(
         billing_account: Optional[str],
         enrollment_account: Optional[str],
         aad_token: Optional[str],
+        retail_cache_dir: Optional[str] = None,
+        retail_cache_ttl_hours: Optional[float] = None,
 ) -> None:
     """
     Execute the pricing model:
@@ -272,10 +304,24 @@ def run_model(
       - retail_offline (arg) or bom["retail_offline"] enables the JSON dump.
       - retail_filter (arg) or bom["retail_filter"] is passed to the Retail API $filter.
       - retail_temp_dir (arg) or bom["retail_temp_dir"] controls where JSON pages are stored.
+      - retail_cache_dir / retail_cache_ttl_hours (arg or BOM) control the on-disk cache
+        of live Retail API responses (TTL 0 disables it).
     """
     currency = currency_override or bom.get("currency", "AUD")
     assumptions = bom.get("assumptions", {})
 
+    # Each run starts from fresh in-process caches (breaker, memos); the on-disk
+    # response cache still spans runs.
+    clear_retail_cache()
+    configure_retail_cache(
+        cache_dir=retail_cache_dir or bom.get("retail_cache_dir"),
+        ttl_hours=(
+            retail_cache_ttl_hours
+            if retail_cache_ttl_hours is not None
+            else bom.get("retail_cache_ttl_hours")
+        ),
+    )
+
     # -----------------------------------------------------------------------
     # 1) Retail JSON dump (per-page) – optional but enabled if retail_offline set
     # -----------------------------------------------------------------------
@@ -316,55 +362,64 @@ def run_model(
     print("\n=== Monthly Cost by Workload (Original vs With SP/RI modelling) ===")
     print(f"{'Workload':25} {'Tier':8} {'PAYG est.':>16} {'With Opt.':>16}")
 
-    grand_total_opt = Decimal(0)
+    grand_total_opt = _ZERO
 
     # -----------------------------------------------------------------------
     # 3) Iterate workloads and price components
     # -----------------------------------------------------------------------
-    for wl in bom.get("workloads", []):
-        wl_name = wl.get("name", "(unnamed)")
-        # Normalise human-readable region to ARM style
-        wl_region = arm_region(wl.get("region", "Australia East"))
-        handlers = _make_handlers(region=wl_region, currency=currency, ent_prices=ent_prices)
-
-        wl_total = Decimal(0)
-        print(f"\n-- {wl_name} components ({wl_region}) --")
-
-        for comp in wl.get("components", []):
-            comp_type = comp.get("type", "")
-            fn = handlers.get(comp_type)
-
-            if fn is None:
-                expected = ", ".join(sorted(handlers.keys()))
-                log.warning(
-                    "No handler for component type %r. Expected one of: %s",
-                    comp_type,
-                    expected,
-                )
-                continue
-
-            prepared = _prepare_component(comp, assumptions)
-
-            try:
-                cost, desc = fn(prepared)
-            except Exception as exc:
-                log.warning("Pricing error for %s/%s: %s", wl_name, comp_type, exc)
-                cost, desc = Decimal(0), f"Error: {exc}"
-
-            wl_total += cost
-            print(f"  • {comp_type:<18} {desc:<70} = ${cost:,.2f}")
-
-        # -------------------------------------------------------------------
-        # 4) Apply optimisation view
-        # -------------------------------------------------------------------
-        wl_total_opt = apply_optimisations(wl_total, assumptions)
-        grand_total_opt += wl_total_opt
-
-        print(
-            f"{wl_name:25} {wl.get('tier','-'):8} "
-            f"{('$' + format(wl_total, ',.2f')):>16} "
-            f"{('$' + format(wl_total_opt, ',.2f')):>16}"
-        )
+    # Components are independent and I/O-bound (Retail API), so submit them all
+    # up-front and collect results in BOM order for printing.
+    with ThreadPoolExecutor(
+            max_workers=_MAX_COMPONENT_WORKERS,
+            thread_name_prefix="component",
+    ) as pool:
+        planned = []
+        for wl in bom.get("workloads", []):
+            wl_name = wl.get("name", "(unnamed)")
+            # Normalise human-readable region to ARM style
+            wl_region = arm_region(wl.get("region", "Australia East"))
+            handlers = _make_handlers(region=wl_region, currency=currency, ent_prices=ent_prices)
+
+            futures = []
+            for comp in wl.get("components", []):
+                comp_type = comp.get("type", "")
+                fn = handlers.get(comp_type)
+
+                if fn is None:
+                    expected = ", ".join(sorted(handlers.keys()))
+                    log.warning(
+                        "No handler for component type %r. Expected one of: %s",
+                        comp_type,
+                        expected,
+                    )
+                    continue
+
+                prepared = _prepare_component(comp, assumptions)
+                future = pool.submit(_price_component, fn, prepared, wl_name, comp_type)
+                futures.append((comp_type, future))
+
+            planned.append((wl, wl_name, wl_region, futures))
+
+        for wl, wl_name, wl_region, futures in planned:
+            wl_total = _ZERO
+            print(f"\n-- {wl_name} components ({wl_region}) --")
+
+            for comp_type, future in futures:
+                cost, desc = future.result()
+                wl_total += cost
+                print(f"  • {comp_type:<18} {desc:<70} = ${cost:,.2f}")
+
+            # ---------------------------------------------------------------
+            # 4) Apply optimisation view
+            # ---------------------------------------------------------------
+            wl_total_opt = apply_optimisations(wl_total, assumptions)
+            grand_total_opt += wl_total_opt
+
+            print(
+                f"{wl_name:25} {wl.get('tier','-'):8} "
+                f"{('$' + format(wl_total, ',.2f')):>16} "
+                f"{('$' + format(wl_total_opt, ',.2f')):>16}"
+            )
 
     # -----------------------------------------------------------------------
     # 5) Final summary
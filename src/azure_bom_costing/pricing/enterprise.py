@@ -1,12 +1,13 @@
 from __future__ import annotations
 from decimal import Decimal
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, cast
 
 import csv
 import gzip
 import io
 import zipfile
 
+from ..helpers import fastjson
 from ..helpers.csv import clean_rows
 from ..helpers.http import http_get_json, http_get
 from ..helpers.math import decimal
@@ -88,12 +89,13 @@ def _fetch_pricesheet_rows_or_json(download_url: str) -> List[Dict[str, Any]] |
     if "csv" in ctype or download_url.lower().endswith(".csv"):
         return clean_rows(_csv_rows_from_bytes(raw))
 
-    # Some tenants return JSON
+    # Some tenants return JSON (decode the bytes we already have; don't re-download)
     try:
-        data = http_get_json(download_url)
+        data = fastjson.loads(raw)
         if isinstance(data, list) and all(isinstance(x, dict) for x in data):
             return clean_rows(data)
-        return data
+        # Unknown shape: passed through as-is (typed like http_get_json's result)
+        return cast(Dict[str, Any], data)
     except Exception:
         # Not valid JSON → try CSV anyway
         return clean_rows(_csv_rows_from_bytes(raw))
@@ -1,23 +1,32 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from urllib.parse import quote as url_quote
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Dict, Iterable, Tuple
 
 import errno
+import hashlib
 import json
 import os
 import re
+import threading
 import time
 
+from ..helpers import fastjson
 from ..helpers.csv import clean_rows
 from ..helpers.http import get_session
-from ..helpers.math import decimal
 
 # =============================================================================
 # Constants & module state
 # =============================================================================
 
 RETAIL_API = "https://prices.azure.com/api/retail/prices?api-version=2023-01-01-preview"
+_JSON_HEADERS = {"Accept": "application/json"}
+# Live lookups only need primary meter regions; lets the API drop the rest server-side
+_PRIMARY_METERS = "&meterRegion='primary'"
+# Base of every live query; part of the disk-cache key so a change to the API
+# version or query parameters never serves responses fetched under the old ones.
+_LIVE_QUERY = f"{RETAIL_API}{_PRIMARY_METERS}"
 
 # We still keep checkpoint/lock so you can resume a long download
 _CHECKPOINT_NAME = "retail-prices"        # base name for checkpoint + lock
@@ -27,6 +36,38 @@ _LOCK_SUFFIX = ".lock"
 _DIR_EXAMPLES = "examples"
 _DIR_RETAIL_TEMP = "retail"
 
+# Persistent cache of live Retail API responses, shared across CLI runs.
+# Retail list prices change at most daily, so a day-long TTL keeps re-runs offline.
+DEFAULT_RETAIL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "azure-bom", "retail")
+DEFAULT_RETAIL_CACHE_TTL_HOURS = 24.0
+
+_cache_dir: Optional[str] = DEFAULT_RETAIL_CACHE_DIR
+_cache_ttl_seconds: float = DEFAULT_RETAIL_CACHE_TTL_HOURS * 3600
+
+# In-process memo in front of the disk cache: (filter, CURRENCY) -> (fetched_at, rows).
+# Rows are shared between callers, who only read them.
+_MEMORY_TTL_SECONDS = 6 * 3600
+_memory_cache: Dict[Tuple[str, str], Tuple[float, List[dict]]] = {}
+_memory_lock = threading.Lock()
+# Per-key locks so concurrent callers asking for the same filter share one fetch
+# (dropped by clear_retail_cache, so they don't pile up across runs).
+_key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+# Saved-page index per temp_dir: field -> lowered value -> items (page order).
+# Pages are decoded once per run (no separate items list is kept); dropped by
+# clear_retail_cache() and by download_retail_pages().
+_SAVED_INDEX_FIELDS = ("serviceName", "productName")
+_saved_cache: Dict[str, Dict[str, Dict[str, List[dict]]]] = {}
+_saved_lock = threading.Lock()
+# Per-temp_dir locks so concurrent searches share one decode of the pages, and an
+# epoch bumped on every drop so a decode that raced one isn't published.
+_saved_build_locks: Dict[str, threading.Lock] = {}
+_saved_epoch = 0
+# Callbacks run by clear_retail_cache() for memos layered above these caches.
+_clear_hooks: List[Callable[[], None]] = []
+# Circuit breaker: filters whose live fetch already failed (after retries) this run
+# (reset by clear_retail_cache at the start of each run_model).
+_failed_filters: Dict[Tuple[str, str], str] = {}
+
 
 # =============================================================================
 # Small helpers
@@ -88,11 +129,17 @@ def _has_positive_price(row: dict) -> bool:
     (Useful when searching; not required to save pages.)
     """
     try:
-        return decimal(row.get("retailPrice") or row.get("unitPrice") or 0) > 0
-    except Exception:
+        return float(row.get("retailPrice") or row.get("unitPrice") or 0) > 0
+    except (TypeError, ValueError):
         return False
 
 
+def _is_primary_meter(row: dict) -> bool:
+    """False only for rows explicitly flagged as a non-primary meter region."""
+    flag = row.get("isPrimaryMeterRegion")
+    return flag is None or str(flag).lower() != "false"
+
+
 # =============================================================================
 # Downloader: Retail → per-page JSON files
 # =============================================================================
@@ -126,7 +173,6 @@ def download_retail_pages(
     base += f"&currencyCode={currency}"
 
     session = get_session()
-    session.headers.update({"Accept": "application/json"})
 
     cp_path = os.path.join(temp_dir, _CHECKPOINT_NAME + _CHECKPOINT_SUFFIX)
     lock_path = os.path.join(temp_dir, _CHECKPOINT_NAME + _LOCK_SUFFIX)
@@ -156,9 +202,9 @@ def download_retail_pages(
             max_attempts, backoff = 4, 0.75
             for attempt in range(1, max_attempts + 1):
                 try:
-                    resp = session.get(url, timeout=120)
+                    resp = session.get(url, headers=_JSON_HEADERS, timeout=120)
                     resp.raise_for_status()
-                    data = resp.json()
+                    data = fastjson.loads(resp.content)
                     break
                 except Exception:
                     if attempt == max_attempts:
@@ -200,6 +246,7 @@ def download_retail_pages(
         return pages_downloaded
 
     finally:
+        _forget_saved_pages(temp_dir)
         _release_lock(lock_fd, lock_path)
 
 
@@ -210,18 +257,8 @@ def download_retail_pages(
 _EQ_RE = re.compile(r"\s*(\w+)\s+eq\s+'([^']*)'\s*", re.IGNORECASE)
 _CONTAINS_RE = re.compile(r"\s*contains\(\s*(\w+)\s*,\s*'([^']*)'\s*\)\s*", re.IGNORECASE)
 
-def _parse_simple_filter(filter_expr: str) -> List[Callable[[dict], bool]]:
-    """
-    Tiny subset of OData $filter:
-      - "field eq 'value'"
-      - "contains(field,'value')"
-      - clauses ANDed together
-      - parentheses allowed but ignored for precedence
-    """
-    if not filter_expr:
-        return [lambda _: True]
-
-    # Split by top-level " and "
+def _split_and(filter_expr: str) -> List[str]:
+    """Split a filter expression on top-level ' and ' (parentheses respected)."""
     parts: List[str] = []
     depth, buf = 0, []
     s = filter_expr
@@ -241,9 +278,38 @@ def _parse_simple_filter(filter_expr: str) -> List[Callable[[dict], bool]]:
         i += 1
     if buf:
         parts.append("".join(buf).strip())
+    return parts
+
+
+@lru_cache(maxsize=512)
+def _indexed_eq(filter_expr: str) -> Optional[Tuple[str, str]]:
+    """
+    First "field eq 'value'" clause on an indexed saved-page field, as
+    (field, lowered value); None if the filter has no such clause.
+    """
+    for p in _split_and(filter_expr or ""):
+        m = _EQ_RE.fullmatch(p)
+        if m and m.group(1) in _SAVED_INDEX_FIELDS:
+            return m.group(1), m.group(2).lower()
+    return None
+
+
+@lru_cache(maxsize=512)
+def _parse_simple_filter(filter_expr: str) -> Tuple[Callable[[dict], bool], ...]:
+    """
+    Tiny subset of OData $filter:
+      - "field eq 'value'"
+      - "contains(field,'value')"
+      - clauses ANDed together
+      - parentheses allowed but ignored for precedence
+
+    Memoised: the same handful of filter strings are searched for every component.
+    """
+    if not filter_expr:
+        return (lambda _: True,)
 
     preds: List[Callable[[dict], bool]] = []
-    for p in parts:
+    for p in _split_and(filter_expr):
         m = _EQ_RE.fullmatch(p)
         if m:
             fld, val = m.group(1), m.group(2)
@@ -265,15 +331,15 @@ def _parse_simple_filter(filter_expr: str) -> List[Callable[[dict], bool]]:
         # Unknown clause → accept all (permissive)
         preds.append(lambda row: True)
 
-    return preds
+    return tuple(preds)
 
 
-def _iter_saved_pages(temp_dir: str):
+def _saved_page_paths(temp_dir: str) -> List[str]:
     """
-    Yield raw JSON page dicts from temp_dir, ordered by page number.
+    Paths of the saved page files in temp_dir, ordered by page number.
     """
     if not os.path.isdir(temp_dir):
-        return
+        return []
     # Files look like retail-prices-<n>.json
     names = [
         n for n in os.listdir(temp_dir)
@@ -287,11 +353,16 @@ def _iter_saved_pages(temp_dir: str):
         except ValueError:
             return 0
 
-    for name in sorted(names, key=_page_key):
-        path = os.path.join(temp_dir, name)
+    return [os.path.join(temp_dir, name) for name in sorted(names, key=_page_key)]
+
+
+def _iter_saved_pages(temp_dir: str):
+    """
+    Yield raw JSON page dicts from temp_dir, ordered by page number.
+    """
+    for path in _saved_page_paths(temp_dir):
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                yield json.load(f)
+            yield fastjson.load_file(path)
         except Exception:
             # Skip corrupt page files
             continue
@@ -306,6 +377,45 @@ def _iter_saved_items(temp_dir: str):
             yield item
 
 
+def _saved_index(temp_dir: str) -> Dict[str, Dict[str, List[dict]]]:
+    """
+    Index of the saved items by lowered serviceName/productName (page order kept).
+    Every page is decoded in one pass, outside _saved_lock; concurrent callers for
+    the same temp_dir wait for that pass instead of repeating it.
+    """
+    key = os.path.abspath(temp_dir)
+    with _saved_lock:
+        index = _saved_cache.get(key)
+        if index is not None:
+            return index
+        build_lock = _saved_build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        with _saved_lock:
+            index = _saved_cache.get(key)
+            epoch = _saved_epoch
+        if index is not None:
+            return index
+
+        index = {f: {} for f in _SAVED_INDEX_FIELDS}
+        for item in _iter_saved_items(temp_dir):
+            for fld, by_value in index.items():
+                by_value.setdefault(str(item.get(fld) or "").lower(), []).append(item)
+
+        with _saved_lock:
+            if epoch == _saved_epoch:
+                _saved_cache[key] = index
+        return index
+
+
+def _forget_saved_pages(temp_dir: str) -> None:
+    """Drop the index for temp_dir (its page files have changed)."""
+    global _saved_epoch
+    with _saved_lock:
+        _saved_cache.pop(os.path.abspath(temp_dir), None)
+        _saved_epoch += 1
+
+
 def search_saved_retail_items(
         filter_expr: str,
         currency: str = "AUD",
@@ -325,14 +435,26 @@ def search_saved_retail_items(
     preds = _parse_simple_filter(filter_expr)
     cur = (currency or "").upper()
 
+    # Use the serviceName/productName bucket when the filter pins one;
+    # anything else streams the pages as before (nothing kept resident).
+    eq = _indexed_eq(filter_expr)
+    items: Iterable[dict]
+    if eq is not None:
+        items = _saved_index(temp_dir)[eq[0]].get(eq[1], [])
+    else:
+        items = _iter_saved_items(temp_dir)
+
     matched: List[dict] = []
-    for item in _iter_saved_items(temp_dir):
+    for item in items:
         # Currency filter
         if cur and (item.get("currencyCode") or "").upper() not in ("", cur):
             continue
         # Optional positive price filter
         if require_positive_price and not _has_positive_price(item):
             continue
+        # Same rule as the live query's meterRegion='primary'
+        if not _is_primary_meter(item):
+            continue
         # Filter predicates
         if all(pred(item) for pred in preds):
             matched.append(item)
@@ -341,6 +463,106 @@ def search_saved_retail_items(
     return clean_rows(matched)
 
 
+# =============================================================================
+# Persistent response cache for live fetches
+# =============================================================================
+
+def configure_retail_cache(
+        cache_dir: Optional[str] = None,
+        ttl_hours: Optional[float] = None,
+) -> None:
+    """
+    Configure the on-disk cache used by retail_fetch_items_live().
+
+    - cache_dir: directory for cached responses (default ~/.cache/azure-bom/retail).
+    - ttl_hours: how long a cached response is reused; 0 disables the cache
+      (default 24h).
+
+    Both arguments reset to their defaults when None, so each call fully
+    replaces the previous configuration.
+    """
+    global _cache_dir, _cache_ttl_seconds
+    if ttl_hours is None:
+        ttl_hours = DEFAULT_RETAIL_CACHE_TTL_HOURS
+    _cache_ttl_seconds = max(0.0, float(ttl_hours)) * 3600
+    _cache_dir = cache_dir or DEFAULT_RETAIL_CACHE_DIR
+
+
+def _cache_path(filter_expr: str, currency: str) -> Optional[str]:
+    """Cache file for one (filter, currency) pair, or None if caching is disabled."""
+    if not _cache_dir or _cache_ttl_seconds <= 0:
+        return None
+    key = f"{_LIVE_QUERY}|{currency.upper()}|{filter_expr}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(_cache_dir, f"{digest}.json")
+
+
+def _read_cached_items(path: Optional[str]) -> Optional[List[dict]]:
+    """Return cached rows if the file exists and is younger than the TTL."""
+    if path is None:
+        return None
+    try:
+        if time.time() - os.path.getmtime(path) > _cache_ttl_seconds:
+            return None
+        data = fastjson.load_file(path)
+    except Exception:
+        return None
+    return data.get("Items") if isinstance(data, dict) else None
+
+
+def _write_cached_items(
+        path: Optional[str],
+        filter_expr: str,
+        currency: str,
+        items: List[dict],
+) -> None:
+    """Best-effort atomic write; a failed cache write never fails pricing."""
+    if path is None:
+        return
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"filter": filter_expr, "currency": currency, "Items": items}, f)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+
+
+def _remember(key: Tuple[str, str], rows: List[dict]) -> None:
+    with _memory_lock:
+        _memory_cache[key] = (time.time(), rows)
+
+
+def on_clear_retail_cache(hook: Callable[[], None]) -> None:
+    """Register a callback (e.g. an lru_cache's cache_clear) for clear_retail_cache()."""
+    _clear_hooks.append(hook)
+
+
+def clear_retail_cache() -> None:
+    """
+    Drop the in-process memo, per-filter locks, saved-page index, failed-filter
+    record and parsed filters, plus any memo registered via on_clear_retail_cache()
+    (files on disk are left alone). run_model calls this at the start of every run.
+    """
+    global _saved_epoch
+    with _memory_lock:
+        _memory_cache.clear()
+        _key_locks.clear()
+        _failed_filters.clear()
+    with _saved_lock:
+        _saved_cache.clear()
+        _saved_build_locks.clear()
+        _saved_epoch += 1
+    _parse_simple_filter.cache_clear()
+    _indexed_eq.cache_clear()
+    for hook in _clear_hooks:
+        hook()
+
+
 # =============================================================================
 # Optional: live API fetch (no temp, no CSV)
 # =============================================================================
@@ -352,10 +574,44 @@ def retail_fetch_items_live(
     """
     Fetch items directly from the Retail API (no temp files, no CSV).
     Useful if you just want in-memory rows.
+
+    Responses are cached on disk per (filter, currency) for the configured TTL
+    (see configure_retail_cache), so repeated runs skip the HTTP round-trips.
+
+    A filter whose fetch has already failed (after retries) fails fast for the
+    rest of the run instead of retrying again; clear_retail_cache(), called at
+    the start of each run_model, resets it.
     """
-    url = f"{RETAIL_API}&$filter={url_quote(filter_expr)}&currencyCode={currency}"
+    mem_key = (filter_expr, currency.upper())
+    with _memory_lock:
+        key_lock = _key_locks.setdefault(mem_key, threading.Lock())
+
+    with key_lock:
+        with _memory_lock:
+            hit = _memory_cache.get(mem_key)
+            failed = _failed_filters.get(mem_key)
+        if hit is not None and time.time() - hit[0] <= _MEMORY_TTL_SECONDS:
+            return hit[1]
+        if failed is not None:
+            raise RuntimeError(f"Retail API query failed earlier in this run: {failed}")
+        try:
+            return _fetch_items_live(filter_expr, currency, mem_key)
+        except Exception as e:
+            with _memory_lock:
+                _failed_filters[mem_key] = str(e) or type(e).__name__
+            raise
+
+
+def _fetch_items_live(filter_expr: str, currency: str, mem_key: Tuple[str, str]) -> List[dict]:
+    """Disk cache, then the Retail API (paged); remembers the result in-process."""
+    cache_path = _cache_path(filter_expr, currency)
+    cached = _read_cached_items(cache_path)
+    if cached is not None:
+        _remember(mem_key, cached)
+        return cached
+
+    url = f"{_LIVE_QUERY}&$filter={url_quote(filter_expr)}&currencyCode={currency}"
     session = get_session()
-    session.headers.update({"Accept": "application/json"})
 
     items: List[dict] = []
     seen_urls: set[str] = set()
@@ -371,9 +627,9 @@ def retail_fetch_items_live(
 
         for attempt in range(1, max_attempts + 1):
             try:
-                r = session.get(url, timeout=60)
+                r = session.get(url, headers=_JSON_HEADERS, timeout=60)
                 r.raise_for_status()
-                data = r.json()
+                data = fastjson.loads(r.content)
                 break
             except Exception:
                 if attempt == max_attempts:
@@ -383,4 +639,7 @@ def retail_fetch_items_live(
         items.extend(data.get("Items", []) or [])
         url = data.get("NextPageLink")
 
-    return clean_rows(items)
\ No newline at end of file
+    rows = clean_rows(items)
+    _write_cached_items(cache_path, filter_expr, currency, rows)
+    _remember(mem_key, rows)
+    return rows
\ No newline at end of file
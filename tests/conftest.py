@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from azure_bom_costing.helpers import pricing
+from azure_bom_costing.pricing.retail import _parse_simple_filter, clear_retail_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    clear_retail_cache()
+    yield
+    clear_retail_cache()
+
+
+@pytest.fixture
+def serve_retail(monkeypatch):
+    """
+    Price offline: saved pages are empty and live Retail API calls are answered
+    from the given (cleaned) rows. Returns serve(rows, *, latency, fail), which
+    installs the stub and returns the list of filters it was called with.
+
+    - latency: optional filter -> seconds to sleep before answering.
+    - fail: optional filter -> bool; matching calls raise RuntimeError.
+    """
+    def serve(rows, *, latency=None, fail=None):
+        calls = []
+
+        def fake_live(filter_expr, currency):
+            calls.append(filter_expr)
+            if latency is not None:
+                time.sleep(latency(filter_expr))
+            if fail is not None and fail(filter_expr):
+                raise RuntimeError(f"retail API down for {filter_expr}")
+            preds = _parse_simple_filter(filter_expr)
+            return [r for r in rows if all(p(r) for p in preds)]
+
+        monkeypatch.setattr(pricing, "retail_fetch_items_live", fake_live)
+        monkeypatch.setattr(pricing, "search_saved_retail_items", lambda **_: [])
+        return calls
+
+    return serve
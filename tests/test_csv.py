@@ -0,0 +1,29 @@
+from azure_bom_costing.helpers.csv import dedup_merge, pick
+
+
+def test_dedup_merge_keeps_first_row_per_meter_id():
+    first = {"meterId": "m1", "priceType": "Consumption", "retailPrice": "1"}
+    later = {"meterId": "m1", "priceType": "DevTestConsumption", "retailPrice": "0.5"}
+    other = {"meterId": "m2", "retailPrice": "2"}
+
+    assert dedup_merge([[first, other], [later]]) == [first, other]
+
+
+def test_dedup_merge_falls_back_to_descriptive_key_without_meter_id():
+    a = {"serviceName": "S", "skuName": "k", "meterName": "m", "unitOfMeasure": "1 Hour",
+         "armRegionName": "australiaeast"}
+    b = dict(a, armRegionName="")
+
+    assert dedup_merge([[a, dict(a)], [b]]) == [a, b]
+
+
+def test_pick_prefers_positive_row_with_uom_then_first_positive():
+    free = {"unitOfMeasure": "1 Hour", "retailPrice": "0"}
+    gb = {"unitOfMeasure": "1 GB", "retailPrice": "0.2"}
+    hour = {"unitOfMeasure": "1 Hour", "retailPrice": "0.5"}
+
+    assert pick([free, gb, hour], prefer_uom="1 Hour") is hour
+    assert pick([free, gb], prefer_uom="1 Hour") is gb
+    assert pick([free, hour]) is hour
+    assert pick([free]) is free
+    assert pick([]) is None
@@ -0,0 +1,103 @@
+from decimal import Decimal
+
+import pytest
+
+from azure_bom_costing import price_model
+from azure_bom_costing.helpers.csv import clean_rows
+
+ROWS = clean_rows([
+    {"serviceName": "Azure App Service", "productName": "Azure App Service Premium v3 Plan",
+     "skuName": "P1 v3", "meterName": "P1 v3 App", "unitOfMeasure": "1 Hour",
+     "retailPrice": 0.2, "currencyCode": "AUD", "armRegionName": "australiaeast",
+     "priceType": "Consumption", "meterId": "app-p1"},
+    {"serviceName": "Azure App Service", "productName": "Azure App Service Premium v3 Plan",
+     "skuName": "P2 v3", "meterName": "P2 v3 App", "unitOfMeasure": "1 Hour",
+     "retailPrice": 0.4, "currencyCode": "AUD", "armRegionName": "australiaeast",
+     "priceType": "Consumption", "meterId": "app-p2"},
+    {"serviceName": "Virtual Machines", "productName": "Virtual Machines Dv5 Series",
+     "skuName": "D2 v5", "meterName": "D2 v5", "unitOfMeasure": "1 Hour",
+     "retailPrice": 0.1, "currencyCode": "AUD", "armRegionName": "australiaeast",
+     "priceType": "Consumption", "meterId": "vm-d2"},
+    {"serviceName": "Storage", "productName": "Blob Storage",
+     "skuName": "Hot LRS", "meterName": "Hot LRS Data Stored", "unitOfMeasure": "1 GB/Month",
+     "retailPrice": 0.025, "currencyCode": "AUD", "armRegionName": "",
+     "priceType": "Consumption", "meterId": "blob-hot"},
+])
+
+BOM = {
+    "currency": "AUD",
+    "workloads": [
+        {"name": "web", "region": "Australia East", "components": [
+            {"type": "app_service", "service": "Azure App Service", "sku": "P1 v3",
+             "uom": "1 Hour", "instances": 2},
+            {"type": "vm", "service": "Virtual Machines", "sku": "D2 v5",
+             "uom": "1 Hour", "instances": 3},
+            {"type": "app_service", "service": "Azure App Service", "sku": "P2 v3",
+             "uom": "1 Hour", "instances": 1},
+        ]},
+        {"name": "data", "region": "Australia East", "components": [
+            {"type": "storage", "service": "Storage", "sku": "Hot LRS",
+             "uom": "1 GB/Month", "gb": 500, "hours_per_month": 1},
+            {"type": "vm", "service": "Virtual Machines", "sku": "D2 v5",
+             "uom": "1 Hour", "instances": 1},
+            {"type": "unknown_type", "service": "Nope"},
+        ]},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def _offline_retail(serve_retail, monkeypatch, tmp_path):
+    # Uneven latencies, so components finish out of BOM order when run concurrently.
+    serve_retail(ROWS, latency=lambda f: 0.01 if "armRegionName" in f else 0.002)
+    monkeypatch.chdir(tmp_path)
+
+
+def _run(capsys):
+    price_model.run_model(
+        bom=BOM,
+        currency_override=None,
+        retail_offline=False,
+        retail_filter=None,
+        retail_temp_dir=None,
+        enterprise_csv=None,
+        enterprise_price_sheet_api=None,
+        billing_account=None,
+        enrollment_account=None,
+        aad_token=None,
+        retail_cache_ttl_hours=0,
+    )
+    return capsys.readouterr().out
+
+
+def test_concurrent_run_matches_serial_run(monkeypatch, capsys):
+    monkeypatch.setattr(price_model, "_MAX_COMPONENT_WORKERS", 1)
+    serial = _run(capsys)
+
+    monkeypatch.setattr(price_model, "_MAX_COMPONENT_WORKERS", 16)
+    concurrent = _run(capsys)
+
+    assert concurrent == serial
+
+
+def test_output_keeps_bom_order_and_totals(capsys):
+    out = _run(capsys)
+    lines = [line.strip() for line in out.splitlines()]
+    components = [line for line in lines if line.startswith("•")]
+
+    assert [c.split()[1] for c in components] == [
+        "app_service", "vm", "app_service", "storage", "vm",
+    ]
+    # web:  0.2×2×730 + 0.1×3×730 + 0.4×1×730 = 803.00
+    # data: 0.025×500×1 + 0.1×1×730 = 85.50
+    assert components[0].endswith("= $292.00")
+    assert components[1].endswith("= $219.00")
+    assert components[2].endswith("= $292.00")
+    assert components[3].endswith("= $12.50")
+    assert components[4].endswith("= $73.00")
+    assert any(line.startswith("web") and "$803.00" in line for line in lines)
+    assert any(line.startswith("data") and "$85.50" in line for line in lines)
+
+
+def test_apply_optimisations_without_coverage_is_identity() -> None:
+    assert price_model.apply_optimisations(Decimal("100"), {}) == Decimal("100")
@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+import pytest
+
+from azure_bom_costing.handlers.api_management import price_api_management
+from azure_bom_costing.handlers.vm import price_vm
+from azure_bom_costing.helpers import pricing
+from azure_bom_costing.helpers.csv import clean_rows
+
+
+def _row(**kw):
+    base = {"unitOfMeasure": "1 Hour", "currencyCode": "AUD", "priceType": "Consumption"}
+    base.update(kw)
+    return base
+
+
+def _price(**kw):
+    args = dict(
+        service="Redis Cache", product="Azure Redis Cache", sku="C1", region="australiaeast",
+        currency="AUD", ent_prices={}, uom="1 Hour", qty=Decimal(1), hours=Decimal(10),
+    )
+    args.update(kw)
+    return pricing.price_by_service(**args)
+
+
+def _redis_rows():
+    return clean_rows([
+        _row(serviceName="Redis Cache", productName="Azure Redis Cache", skuName="C1",
+             armRegionName="australiaeast", retailPrice=0.5, meterId="r1"),
+    ])
+
+
+def test_regioned_service_match_skips_global_queries(serve_retail):
+    calls = serve_retail(_redis_rows())
+
+    total, _ = _price()
+
+    assert total == Decimal("5.0")
+    assert all("armRegionName" in f for f in calls)
+
+
+def test_regioned_product_match_does_not_beat_global_service_match(serve_retail):
+    calls = serve_retail(clean_rows([
+        # Only a productName match in-region...
+        _row(serviceName="Other Service", productName="Azure Redis Cache", skuName="C1",
+             armRegionName="australiaeast", retailPrice=9.0, meterId="p1"),
+        # ...but a global (region-less) serviceName match exists.
+        _row(serviceName="Redis Cache", productName="Redis", skuName="C1",
+             armRegionName="", retailPrice=0.3, meterId="g1"),
+    ]))
+
+    total, _ = _price()
+
+    assert total == Decimal("3.0")
+    assert any("armRegionName" not in f for f in calls)
+
+
+def test_zero_usage_skips_lookup_and_reports_unknown_rate(serve_retail):
+    calls = serve_retail([])
+
+    total, desc = _price(qty=Decimal(0))
+
+    assert total == Decimal(0)
+    assert "@n/a/1 Hour" in desc
+    assert calls == []
+
+
+def _apim_rows():
+    return clean_rows([
+        _row(serviceName="API Management", productName="API Management", skuName="Developer",
+             armRegionName="australiaeast", retailPrice=0.07, meterId="apim-dev"),
+    ])
+
+
+def test_api_management_prices_like_the_generic_handlers(serve_retail):
+    serve_retail(_apim_rows())
+    component = {"service": "API Management", "sku": "Developer", "uom": "1 Hour",
+                 "quantity": 2, "hours_per_month": 730}
+
+    apim = price_api_management(component, "australiaeast", "AUD", {})
+    generic = price_vm(component, "australiaeast", "AUD", {})
+
+    assert apim == generic == (
+        Decimal("102.20"),
+        "API Management Developer @0.07/1 Hour × 2 × 730",
+    )
+
+
+def test_api_management_keeps_zero_hours_fallback(serve_retail):
+    serve_retail(_apim_rows())
+    component = {"service": "API Management", "sku": "Developer", "uom": "1 Hour", "quantity": 2}
+
+    total, desc = price_api_management(component, "australiaeast", "AUD", {})
+
+    assert total == Decimal(0)
+    assert desc.endswith("× 2 × 0")
+
+
+def test_price_component_requires_a_service():
+    with pytest.raises(ValueError):
+        pricing.price_component({"sku": "C1"}, "australiaeast", "AUD", {})
+
+
+def test_one_failing_filter_does_not_sink_the_others(serve_retail):
+    calls = serve_retail(_redis_rows(), fail=lambda f: f.startswith("productName"))
+
+    total, _ = _price()
+
+    assert total == Decimal("5.0")
+    assert any(f.startswith("productName") for f in calls)
+
+
+def test_all_filters_failing_raises(serve_retail):
+    serve_retail(_redis_rows(), fail=lambda f: True)
+
+    with pytest.raises(RuntimeError):
+        _price()
@@ -0,0 +1,195 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from azure_bom_costing.pricing import retail
+
+
+_STORAGE = "serviceName eq 'Storage'"
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """Point the on-disk response cache at tmp_path; restore the defaults after."""
+    retail.configure_retail_cache(cache_dir=str(tmp_path))
+    try:
+        yield tmp_path
+    finally:
+        retail.configure_retail_cache()
+
+
+def _save_pages(tmp_path, *pages):
+    for n, items in enumerate(pages, start=1):
+        (tmp_path / f"retail-prices-{n}.json").write_text(json.dumps({"Items": items}))
+    return str(tmp_path)
+
+
+def _item(service, price, **kw):
+    item = {"serviceName": service, "retailPrice": price, "currencyCode": "AUD"}
+    item.update(kw)
+    return item
+
+
+def _prices(rows):
+    return [r["retailPrice"] for r in rows]
+
+
+def test_saved_search_applies_primary_meter_rule(tmp_path):
+    temp_dir = _save_pages(tmp_path, [
+        _item("Storage", 1, isPrimaryMeterRegion=False),
+        _item("Storage", 2, isPrimaryMeterRegion=True),
+        _item("Storage", 3),
+    ])
+
+    rows = retail.search_saved_retail_items("serviceName eq 'Storage'", "AUD", temp_dir=temp_dir)
+
+    assert _prices(rows) == ["2", "3"]
+
+
+def test_disk_cache_key_covers_live_query_parameters(cache_dir, monkeypatch):
+    before = retail._cache_path("serviceName eq 'Storage'", "AUD")
+
+    monkeypatch.setattr(retail, "_LIVE_QUERY", retail.RETAIL_API)
+
+    assert retail._cache_path("serviceName eq 'Storage'", "AUD") != before
+
+
+def _count_page_loads(monkeypatch):
+    loads = []
+    real_load = retail.fastjson.load_file
+    monkeypatch.setattr(retail.fastjson, "load_file", lambda p: loads.append(p) or real_load(p))
+    return loads
+
+
+def test_saved_pages_are_decoded_once_per_run(tmp_path, monkeypatch):
+    temp_dir = _save_pages(
+        tmp_path,
+        [_item("Storage", 1, productName="Blob")],
+        [_item("Backup", 2, productName="Vault")],
+    )
+    loads = _count_page_loads(monkeypatch)
+
+    for expr in ("serviceName eq 'Storage'", "serviceName eq 'Backup'", "productName eq 'Blob'"):
+        assert retail.search_saved_retail_items(expr, "AUD", temp_dir=temp_dir)
+    assert len(loads) == 2
+    assert sorted(retail._saved_cache[os.path.abspath(temp_dir)]) == ["productName", "serviceName"]
+
+    retail.clear_retail_cache()
+    retail.search_saved_retail_items("serviceName eq 'Backup'", "AUD", temp_dir=temp_dir)
+    assert len(loads) == 4
+
+
+def test_rewritten_pages_are_reindexed_after_forget(tmp_path):
+    temp_dir = _save_pages(tmp_path, [_item("Storage", 1)])
+    assert _prices(retail.search_saved_retail_items(_STORAGE, "AUD", temp_dir=temp_dir)) == ["1"]
+
+    _save_pages(tmp_path, [_item("Storage", 5)])
+    retail._forget_saved_pages(temp_dir)
+
+    assert _prices(retail.search_saved_retail_items(_STORAGE, "AUD", temp_dir=temp_dir)) == ["5"]
+
+
+def test_concurrent_saved_searches_share_one_decode(tmp_path, monkeypatch):
+    temp_dir = _save_pages(tmp_path, [_item("Storage", 1)], [_item("Storage", 2)])
+    loads = _count_page_loads(monkeypatch)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(
+            lambda _: retail.search_saved_retail_items(
+                "serviceName eq 'Storage'", "AUD", temp_dir=temp_dir
+            ),
+            range(16),
+        ))
+
+    assert all(_prices(rows) == ["1", "2"] for rows in results)
+    assert len(loads) == 2
+
+
+def test_saved_bucket_matches_unindexed_scan(tmp_path):
+    temp_dir = _save_pages(
+        tmp_path,
+        [_item("Storage", 1, skuName="Hot"), _item("Backup", 2, skuName="Hot")],
+        [_item("storage", 3, skuName="Cool"), _item("Storage", 4, skuName="Hot")],
+    )
+
+    indexed = retail.search_saved_retail_items(
+        "serviceName eq 'Storage' and skuName eq 'Hot'", "AUD", temp_dir=temp_dir
+    )
+    scanned = retail.search_saved_retail_items(
+        "skuName eq 'Hot' and contains(serviceName, 'Storage')", "AUD", temp_dir=temp_dir
+    )
+
+    assert _prices(indexed) == _prices(scanned) == ["1", "4"]
+
+
+def test_unindexed_saved_search_keeps_nothing_resident(tmp_path):
+    temp_dir = _save_pages(tmp_path, [_item("Storage", 1, skuName="Hot")])
+
+    rows = retail.search_saved_retail_items("skuName eq 'Hot'", "AUD", temp_dir=temp_dir)
+
+    assert _prices(rows) == ["1"]
+    assert retail._saved_cache == {}
+
+
+def test_disk_cache_round_trips_items(cache_dir):
+    path = retail._cache_path(_STORAGE, "AUD")
+    items = [_item("Storage", 0.5, meterId="m1")]
+
+    retail._write_cached_items(path, _STORAGE, "AUD", items)
+
+    assert retail._read_cached_items(path) == items
+
+
+def test_disk_cache_ignores_entries_older_than_ttl(cache_dir):
+    retail.configure_retail_cache(cache_dir=str(cache_dir), ttl_hours=1)
+    path = retail._cache_path(_STORAGE, "AUD")
+    retail._write_cached_items(path, _STORAGE, "AUD", [_item("Storage", 0.5)])
+
+    stale = os.path.getmtime(path) - 2 * 3600
+    os.utime(path, (stale, stale))
+
+    assert retail._read_cached_items(path) is None
+
+
+def test_zero_ttl_disables_the_disk_cache(cache_dir):
+    path = retail._cache_path(_STORAGE, "AUD")
+    retail._write_cached_items(path, _STORAGE, "AUD", [_item("Storage", 0.5)])
+
+    retail.configure_retail_cache(cache_dir=str(cache_dir), ttl_hours=0)
+
+    # No path means nothing is read or written, even with a fresh entry on disk
+    assert retail._cache_path(_STORAGE, "AUD") is None
+    assert retail._read_cached_items(None) is None
+
+
+def test_corrupt_disk_cache_entry_is_a_miss(cache_dir):
+    path = retail._cache_path(_STORAGE, "AUD")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"Items": [')
+
+    assert retail._read_cached_items(path) is None
+
+
+def test_failed_filter_fails_fast_until_caches_are_cleared(monkeypatch):
+    calls = []
+
+    def broken_fetch(filter_expr, currency, mem_key):
+        calls.append(filter_expr)
+        raise ConnectionError("retail API unreachable")
+
+    monkeypatch.setattr(retail, "_fetch_items_live", broken_fetch)
+
+    with pytest.raises(ConnectionError):
+        retail.retail_fetch_items_live(_STORAGE, "AUD")
+    with pytest.raises(RuntimeError, match="failed earlier in this run"):
+        retail.retail_fetch_items_live(_STORAGE, "AUD")
+    assert calls == [_STORAGE]
+
+    retail.clear_retail_cache()
+    assert retail._key_locks == {}
+
+    with pytest.raises(ConnectionError):
+        retail.retail_fetch_items_live(_STORAGE, "AUD")
+    assert calls == [_STORAGE, _STORAGE]